@@ -44,6 +44,10 @@ class MyGame(arcade.Window):
         # Initialize the Scene object
         self.scene = None
 
+        # Initialize the coin and wall sprite lists
+        self.coin_list = None
+        self.wall_list = None
+
         # Initialize the player sprite
         self.player_sprite = None
 
@@ -54,17 +58,28 @@ class MyGame(arcade.Window):
         self.camera = None
         self.gui_camera = None
 
+        # Initialize half of the game camera's viewport size, used to center the camera on the player
+        self.half_viewport_width = 0
+        self.half_viewport_height = 0
+
+        # Initialize the last position the game camera was moved to
+        self.last_camera_position = None
+
         # Initialize the state of the keys pressed
         self.left_pressed = False
         self.right_pressed = False
         self.up_pressed = False
         self.down_pressed = False
 
-        # Initialize the score
+        # Initialize the score and the text object used to draw it
         self.score = 0
+        self.score_text = arcade.Text("Score: 0", 10, 10, arcade.csscolor.WHITE, 18)
 
         self.acceleration = 0
 
+        # Whether the player was moving on the previous frame
+        self.prev_moved = False
+
         '''
         self.squish_one = f"{MAIN_PATH}/squish_1"
         self.squish_two = 
@@ -88,16 +103,22 @@ class MyGame(arcade.Window):
         # Set up the game and GUI cameras
         self.camera = arcade.Camera(self.width, self.height)
         self.gui_camera = arcade.Camera(self.width, self.height)
+        self.half_viewport_width = self.camera.viewport_width * 0.5
+        self.half_viewport_height = self.camera.viewport_height * 0.5
+        self.last_camera_position = None
 
         # Define the name of the map file to load
         map_name = f"{MAIN_PATH}/cave_game.tmx"
 
         # Define layer specific options in a dictionary
-        # This will enable spatial hashing for the platforms layer
+        # This will enable spatial hashing for the platforms and coins layers
         layer_options = {
             "Platforms": {
                 "use_spatial_hash": True,
             },
+            "Coins": {
+                "use_spatial_hash": True,
+            },
         }
 
         # Load the tiled map
@@ -107,16 +128,26 @@ class MyGame(arcade.Window):
         # This will automatically add all layers from the map as SpriteLists in the scene
         self.scene = arcade.Scene.from_tilemap(self.tile_map)
 
+        # Keep direct references to the coin and wall layers so they aren't looked up every frame
+        self.coin_list = self.scene["Coins"]
+        self.wall_list = self.scene["Platforms"]
+
+        # The coin collision check in on_update relies on the coins layer being spatially hashed
+        assert self.coin_list.spatial_hash is not None
+
         # Reset the score
         self.score = 0
+        self.score_text.text = "Score: 0"
+
+        # Treat the first frame as moving so the camera snaps to the player
+        self.prev_moved = True
 
         # Set up the player sprite and add it to the scene
         #image_source = f"{MAIN_PATH}/black_square.png"
         image_source = ":resources:images/animated_characters/female_adventurer/femaleAdventurer_idle.png"
         #":resources:images/tiles/boxCrate_double.png"
         self.player_sprite = arcade.Sprite(image_source, CHARACTER_SCALING)
-        self.player_sprite.center_x = 80
-        self.player_sprite.center_y = 256
+        self.player_sprite.position = (80, 256)
         self.scene.add_sprite("Player", self.player_sprite)
 
         # Set the background color if it is defined in the tile map
@@ -125,7 +156,7 @@ class MyGame(arcade.Window):
 
         # Create the physics engine
         self.physics_engine = arcade.PhysicsEnginePlatformer(
-            self.player_sprite, gravity_constant=GRAVITY, walls=self.scene["Platforms"]
+            self.player_sprite, gravity_constant=GRAVITY, walls=self.wall_list
         )
         
         #self.background = arcade.load_texture(f"{MAIN_PATH}/factory_background.png")
@@ -151,25 +182,28 @@ class MyGame(arcade.Window):
         self.gui_camera.use()
 
         # Draw the current score on the screen at the top left corner
-        score_text = f"Score: {self.score}"
-        arcade.draw_text(
-            score_text,
-            10,
-            10,
-            arcade.csscolor.WHITE,
-            18,
-        )
+        self.score_text.draw()
     
     def update_player_horizontal_speed(self):
 
+        # Look up the acceleration and work out the shared speed terms once per call
+        a = self.acceleration
+        m = PLAYER_MOVEMENT_SPEED
+        v = m*a
+        hm = 0.5*m
+
         if self.left_pressed and not self.right_pressed:
             # Update the player's horizontal speed based on the keys pressed
-            self.player_sprite.change_x = max(-PLAYER_MOVEMENT_SPEED, min(PLAYER_MOVEMENT_SPEED*self.acceleration, PLAYER_MOVEMENT_SPEED*0.5*(self.acceleration-1)))
+            change_x = max(-m, min(v, hm*(a-1)))
         elif self.right_pressed and not self.left_pressed:
-            self.player_sprite.change_x = min(PLAYER_MOVEMENT_SPEED, max(PLAYER_MOVEMENT_SPEED*self.acceleration, PLAYER_MOVEMENT_SPEED*0.5*(self.acceleration+1)))
-        elif self.right_pressed == self.left_pressed:
+            change_x = min(m, max(v, hm*(a+1)))
+        else:
             # Reset the player's speed
-            self.player_sprite.change_x = PLAYER_MOVEMENT_SPEED*self.acceleration
+            change_x = v
+
+        # Only write to the sprite when the speed has actually changed
+        if self.player_sprite.change_x != change_x:
+            self.player_sprite.change_x = change_x
             
 
     def on_key_press(self, key, modifiers):
@@ -206,6 +240,23 @@ class MyGame(arcade.Window):
         elif key == arcade.key.RIGHT:
             self.right_pressed = False
 
+    def on_resize(self, width, height):
+        """
+        This method is called whenever the window is resized.
+        It resizes the cameras to match the window and updates the cached half viewport size.
+        """
+
+        super().on_resize(width, height)
+
+        # The cameras don't exist until setup has been called
+        if self.camera is None:
+            return
+
+        self.camera.resize(int(width), int(height))
+        self.gui_camera.resize(int(width), int(height))
+        self.half_viewport_width = self.camera.viewport_width * 0.5
+        self.half_viewport_height = self.camera.viewport_height * 0.5
+
     def center_camera_to_player(self):
         """
         This method centers the camera to the player.
@@ -213,8 +264,8 @@ class MyGame(arcade.Window):
         """
 
         # Calculate the center of the screen based on the player's position
-        screen_center_x = self.player_sprite.center_x - (self.camera.viewport_width / 2)
-        screen_center_y = self.player_sprite.center_y - (self.camera.viewport_height / 2)
+        screen_center_x = self.player_sprite.center_x - self.half_viewport_width
+        screen_center_y = self.player_sprite.center_y - self.half_viewport_height
 
         # Make sure the camera does not go beyond the left or bottom edge of the screen
         if screen_center_x < 32:
@@ -225,13 +276,16 @@ class MyGame(arcade.Window):
         # Calculate the position to center the player
         player_centered = screen_center_x, screen_center_y
 
-        # Move the camera to the calculated position
-        self.camera.move_to(player_centered)
+        # Move the camera to the calculated position, unless it is already there
+        if player_centered != self.last_camera_position:
+            self.camera.move_to(player_centered)
+            self.last_camera_position = player_centered
 
-    def on_update(self, delta_time):
+    def on_update(self, delta_time, _check=arcade.check_for_collision_with_list, _play=arcade.play_sound):
         """
         This method contains the game logic that is updated every frame.
         It moves the player, checks for collisions with coins, and positions the camera.
+        The arcade functions used every frame are bound as default arguments so they are looked up once.
         """
 
         # Checks every frame for a jump input, changes player Y if player is able to jump
@@ -254,26 +308,39 @@ class MyGame(arcade.Window):
 
         self.update_player_horizontal_speed()
 
-        # Move the player using the physics engine
-        self.physics_engine.update()
+        # Move the player using the physics engine, unless they are standing still on the ground
+        # where gravity and collisions have already been resolved
+        player = self.player_sprite
+        if player.change_x != 0 or player.change_y != 0 or not self.physics_engine.can_jump():
+            self.physics_engine.update()
+
+        # Coins don't move, so there is nothing new to hit and no camera to move while the player is still.
+        # The frame after the player stops still runs so the camera settles on the final position.
+        moved = self.player_sprite.change_x != 0 or self.player_sprite.change_y != 0
+        was_moving = self.prev_moved
+        self.prev_moved = moved
+        if not moved and not was_moving:
+            return
 
         # Check if the player has collided with any coins
-        coin_hit_list = arcade.check_for_collision_with_list(
-            self.player_sprite, self.scene["Coins"]
+        # Method 1 goes straight to the spatial hash set up for the coins layer
+        coin_hit_list = _check(
+            self.player_sprite, self.coin_list, method=1
         )
 
-        if arcade.check_for_collision_with_list(self.player_sprite, self.scene["Don't Touch"]) != []:
-            self.player_sprite.center_x = 80
-            self.player_sprite.center_y = 256
-
-        # For each coin the player has hit, remove the coin, play a sound, and increase the score
-        for coin in coin_hit_list:
-            # Remove the coin from the sprite lists
-            coin.remove_from_sprite_lists()
+        if _check(self.player_sprite, self.scene["Don't Touch"]) != []:
+            self.player_sprite.position = (80, 256)
+
+        # Remove every coin the player has hit, increase the score, and play the sound once
+        if coin_hit_list:
+            # Coins only live in the coin layer, so remove them from it directly
+            for coin in coin_hit_list:
+                self.coin_list.remove(coin)
+            # Increase the score by one for each coin
+            self.score += len(coin_hit_list)
+            self.score_text.text = f"Score: {self.score}"
             # Play the sound of collecting a coin
-            arcade.play_sound(self.collect_coin_sound)
-            # Increase the score by one
-            self.score += 1
+            _play(self.collect_coin_sound)
 
         # Position the camera to center the player
         self.center_camera_to_player()
@@ -288,11 +288,9 @@ class MyGame(arcade.Window):
 
         # Set up the player, specifically placing it at these coordinates.
         self.player_sprite = PlayerCharacter()
-        self.player_sprite.center_x = (
-            self.tile_map.tile_width * TILE_SCALING * PLAYER_START_X
-        )
-        self.player_sprite.center_y = (
-            self.tile_map.tile_height * TILE_SCALING * PLAYER_START_Y
+        self.player_sprite.position = (
+            self.tile_map.tile_width * TILE_SCALING * PLAYER_START_X,
+            self.tile_map.tile_height * TILE_SCALING * PLAYER_START_Y,
         )
         self.scene.add_sprite(LAYER_NAME_PLAYER, self.player_sprite)
 
@@ -311,11 +309,11 @@ class MyGame(arcade.Window):
                 enemy = RobotEnemy()
             elif enemy_type == "zombie":
                 enemy = ZombieEnemy()
-            enemy.center_x = math.floor(
-                cartesian[0] * TILE_SCALING * self.tile_map.tile_width
-            )
-            enemy.center_y = math.floor(
-                (cartesian[1] + 1) * (self.tile_map.tile_height * TILE_SCALING)
+            enemy.position = (
+                math.floor(cartesian[0] * TILE_SCALING * self.tile_map.tile_width),
+                math.floor(
+                    (cartesian[1] + 1) * (self.tile_map.tile_height * TILE_SCALING)
+                ),
             )
             if "boundary_left" in my_object.properties:
                 enemy.boundary_left = my_object.properties["boundary_left"]